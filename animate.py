@@ -19,6 +19,7 @@ class Animator:
         self.cars = sum([ax.plot([], [], color='blue', marker='o', ms=1) for n in range(self.N)], [])
         self.lights = sum([ax.plot([], [], color='red', marker='+', ms=2) for l in range(self.number_of_lights)], [])
         self.faces = sum([ax.plot([], [], color='red', marker='^', ms=2) for f in range(self.number_of_faces)], [])
+        self.annotations = []
 
     def reset(self, num=None):
         """
@@ -48,11 +49,24 @@ class Animator:
         axis = self.ax.axis()
 
         self.num = num if num else self.num
-        self.ax.annotate('Episode {} of {}'.format(self.num[0], self.num[1]), xy=(axis[0] + 10, axis[2] + 10))
+        self.annotations.append(
+            self.ax.annotate('Episode {} of {}'.format(self.num[0], self.num[1]), xy=(axis[0] + 10, axis[2] + 10))
+        )
         self.fig.canvas.draw()
 
         return self.cars + self.lights + self.faces
 
+    def clear(self):
+        """
+        Remove everything this Animator drew from the axes, leaving the figure as it was before
+
+        :return:
+        """
+        for artist in self.cars + self.lights + self.faces + self.annotations:
+            artist.remove()
+        self.annotations = []
+        return
+
     def animate(self, i):
         """
         perform one animation step
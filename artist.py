@@ -26,6 +26,7 @@ from datetime import datetime as dt
 from cars import Cars, TrafficLights
 import convergent_learner as cl
 from matplotlib import animation
+import os
 import osmnx as ox
 import simulation as sim
 from osm_request import OGraph
@@ -57,7 +58,9 @@ def main(
         interactive,
         light_prescaling,
         mp4,
-        serialize
+        serialize,
+        graph=None,
+        movie_dir='.'
 ):
     """
     :param location: str
@@ -68,6 +71,9 @@ def main(
     :param light_prescaling: int
     :param mp4: bool
     :param serialize: bool
+    :param graph: OGraph: optional, an already loaded graph of location to reuse instead of loading one
+    :param movie_dir: str: directory to write the movie (and its frames) into
+    :return movie: str: path of the rendered movie
     """
     query, N = location, cars
 
@@ -80,8 +86,9 @@ def main(
         duration = int(input('Duration of time to simulate (in seconds): '))
 
     # get OGraph object)
-    print('Getting OSM graph..')
-    graph = OGraph(query, save=True)
+    if graph is None:
+        print('Getting OSM graph..')
+        graph = OGraph(query, save=True)
 
     print('Initializing simulation..')
     # get the simulation methods
@@ -99,19 +106,25 @@ def main(
     animate = animator.animate
 
     print(f"{dt.now().strftime('%H:%M:%S')} Now running simulation... ")
-    if not mp4:
-        # for creating HTML movies
-        ani = animation.FuncAnimation(graph.fig, animate,
-                                      init_func=init,
-                                      frames=tqdm(range(n_frames), file=sys.stdout),
-                                      interval=duration,
-                                      blit=True)
-        my_writer = animation.HTMLWriter(fps=frames_per_second)
-        ani.save('traffic.html', writer=my_writer)
-    else:
-        # for creating mp4 movies
-        ani = animation.FuncAnimation(graph.fig, animate, init_func=init, frames=n_frames)
-        my_writer = animation.FFMpegWriter(fps=frames_per_second)
-        ani.save('traffic.mp4', writer=my_writer)
+    try:
+        if not mp4:
+            # for creating HTML movies
+            ani = animation.FuncAnimation(graph.fig, animate,
+                                          init_func=init,
+                                          frames=tqdm(range(n_frames), file=sys.stdout),
+                                          interval=duration,
+                                          blit=True)
+            my_writer = animation.HTMLWriter(fps=frames_per_second)
+            movie = os.path.join(movie_dir, 'traffic.html')
+            ani.save(movie, writer=my_writer)
+        else:
+            # for creating mp4 movies
+            ani = animation.FuncAnimation(graph.fig, animate, init_func=init, frames=n_frames)
+            my_writer = animation.FFMpegWriter(fps=frames_per_second)
+            movie = os.path.join(movie_dir, 'traffic.mp4')
+            ani.save(movie, writer=my_writer)
+    finally:
+        # leave the graph's figure clean in case the graph is reused, even if saving failed
+        animator.clear()
 
-    return
+    return movie
@@ -34,6 +34,8 @@ class Cars:
         self.state = self.init_state.copy()
         self.time_elapsed = 0
         self.lights = 0
+        self.light_obstacles = None
+        self.view_cache = nav.ViewCache()
         self.graph = graph
         self.serialize = serialize
         self.serialize_path = 'data_store'
@@ -71,6 +73,9 @@ class Cars:
         _______
         :return self.state: dataframe
         """
+        if lights is not self.lights:
+            # light positions are fixed, so their arrays only need building when the lights change
+            self.light_obstacles = nav.Obstacles(lights)
         self.lights = lights
         self.time_elapsed += dt
         # determine binning and assign bins to cars
@@ -84,7 +89,7 @@ class Cars:
         self.state['distance-to-red-light'] = light_distances
 
         self.state['route'], self.state['xpath'], self.state['ypath'], self.state['vx'], \
-            self.state['vy'], self.state['route-time'] = sim.update_cars(self.state, self.graph, dt)
+            self.state['vy'], self.state['route-time'] = sim.update_cars(self.state, self.graph, dt, self.view_cache)
 
         self.state['x'] = self.state['x'] + self.state['vx'] * dt
         self.state['y'] = self.state['y'] + self.state['vy'] * dt
@@ -97,11 +102,13 @@ class Cars:
     # TODO: optimize this function
     def find_obstacles(self):
         node_distances, car_distances, light_distances = [], [], []
+        car_obstacles = nav.Obstacles(self.state)
         for car in self.state.iterrows():
-            frontview = nav.FrontView(car[1], self.graph, stop_distance=self.stop_distance)
+            frontview = nav.FrontView(car[1], self.graph, stop_distance=self.stop_distance,
+                                      view_cache=self.view_cache)
             node_distances.append(frontview.distance_to_node())
-            car_distances.append(frontview.distance_to_car(self.state))
-            light_distances.append(frontview.distance_to_light(self.lights))
+            car_distances.append(frontview.distance_to_car(car_obstacles))
+            light_distances.append(frontview.distance_to_light(self.light_obstacles))
 
         return node_distances, car_distances, light_distances
 
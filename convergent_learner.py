@@ -93,6 +93,7 @@ def init_custom_lights(fig_axis, prescale=None):
     light['out-ypositions'] = [y + epsilon * out_vectors[j][1] for j in range(light['degree'])]
     light['out-xvectors'] = [out_vectors[j][0] for j in range(light['degree'])]
     light['out-yvectors'] = [out_vectors[j][1] for j in range(light['degree'])]
+    light['face-vectors'] = list(zip(light['out-xvectors'], light['out-yvectors']))
     light['go-values'] = np.array([go[j] for j in range(light['degree'])])
 
     lights_data.append(light)
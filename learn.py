@@ -42,7 +42,7 @@ def main(
 
     # initialize the Keras training model
     model = Sequential()
-    model.add(layers.InputLayer(batch_input_shape=(1, 10)))
+    model.add(layers.InputLayer(input_shape=(10,)))
     model.add(layers.Dense(10, activation='sigmoid'))
     model.add(layers.Dense(2, activation='linear'))
     model.compile(loss='mse', optimizer='adam', metrics=['mae'])
@@ -57,6 +57,17 @@ def main(
 
     file = open('diag.txt', 'w')
 
+    # one-hot state encodings, pre-sliced into (1, 10) rows so the inner loop does not allocate them
+    # calling the model directly skips the per-call predict() scaffolding
+    I10 = np.eye(10, dtype=np.float32)
+    rows = [I10[s:s + 1] for s in range(10)]
+
+    # replay buffer of (state, target) pairs, trained on in batches to amortize the per-call Keras overhead
+    batch_size = 8
+    buf_x = np.zeros((batch_size, 10), dtype=np.float32)
+    buf_y = np.zeros((batch_size, 2), dtype=np.float32)
+    count = 0
+
     for i in range(num_episodes):
         print("Episode {} of {}".format(i + 1, num_episodes))
         eps *= decay_factor
@@ -71,18 +82,26 @@ def main(
             if rand < eps:
                 action = np.random.randint(0, 2)
             else:
-                action = np.argmax(model.predict(np.identity(10)[state:state + 1]))
+                action = np.argmax(model(rows[state], training=False).numpy())
             new_s, r, done, _ = env.step(action=action, num=(i, num_episodes))
-            target = r + y * np.max(model.predict(np.identity(10)[new_s:new_s + 1]))
-            target_vec = model.predict(np.identity(10)[state:state + 1])[0]
+            target = r + y * np.max(model(rows[new_s], training=False).numpy())
+            target_vec = model(rows[state], training=False).numpy()[0]
             target_vec[action] = target
-            model.fit(np.identity(10)[state:state + 1], target_vec.reshape(-1, 2), epochs=1, verbose=0)
+            buf_x[count], buf_y[count] = rows[state][0], target_vec
+            count += 1
+            if count == batch_size:
+                model.train_on_batch(buf_x, buf_y)
+                count = 0
             state = new_s
             r_sum += r
             print('Action: {}, Reward: {}'.format(action, r))
             file.write('Action: {}, Reward: {}'.format(action, round(r, 2)))
             diag_action += action
             diag_reward += r
+        if count:
+            # flush the partial batch so every episode's experience is trained on before the next one
+            model.train_on_batch(buf_x[:count], buf_y[:count])
+            count = 0
         r_avg_list.append(r_sum)
         r_sum_list.append(sum(r_avg_list) / (i + 1))
         file.write('Episode: {}, Total Rewards: {} \n'.format(i, round(r_sum, 2)))
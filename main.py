@@ -1,25 +1,86 @@
+"""
+Usage:
+
+gunicorn --workers 4 --preload --bind 0.0.0.0:${PORT:-6000} main:app
+
+--preload imports this module once in the gunicorn master, so the graph in WORLD is loaded a single time
+and its memory pages are shared by every worker instead of being rebuilt on each request.
+
+FRAMES_PER_SECOND: optional environment variable for the frame rate of the rendered movie (30 by default)
+
+Rendered movies are kept in movies/<hash of the arguments>/, so every distinct set of arguments has its own
+movie, shared by all workers, and is only rendered again if it is removed from disk. Nothing evicts old movies,
+so movies/ has to be cleaned by hand, for example after changing the simulation code.
+"""
 from artist import *
 from flask import Flask, jsonify
 from flask_cors import CORS
+import hashlib
+import json
+import os
+from osm_request import OGraph
+import shutil
+import tempfile
+
+default_args = {
+    'location': "Западный округ",
+    'cars': 10,
+    'duration': 10,
+    'frames_per_second': int(os.environ.get('FRAMES_PER_SECOND', 30)),
+    'interactive': False,
+    'light_prescaling': 15,
+    'mp4': False,
+    'serialize': False
+}
+
+movies_dir = 'movies'
+
+# the pre-warmed graph shared by all requests
+WORLD = OGraph(default_args['location'], save=True)
 
 app: Flask = Flask(__name__)
 CORS(app)
 
+
+def render(args):
+    """
+    runs the simulation once per distinct set of arguments on the shared graph
+
+    Each render writes into its own temporary directory, which is then renamed to movies/<hash of args>,
+    so workers rendering at the same time never write to the same files. If another worker publishes
+    the same movie first, its copy is kept and this one is discarded.
+
+    :param  args:  dict: keyword arguments for artist.main
+    :return movie:  str: path of the rendered movie
+    """
+    digest = hashlib.sha256(json.dumps(args, sort_keys=True).encode()).hexdigest()[:16]
+    target = os.path.join(movies_dir, digest)
+    movie = os.path.join(target, 'traffic.mp4' if args['mp4'] else 'traffic.html')
+    if os.path.exists(movie):
+        return movie
+
+    os.makedirs(movies_dir, exist_ok=True)
+    temp_dir = tempfile.mkdtemp(prefix='.render-', dir=movies_dir)
+    try:
+        main(**args, graph=WORLD, movie_dir=temp_dir)
+        try:
+            os.rename(temp_dir, target)
+        except OSError:
+            if not os.path.exists(movie):
+                # a stale directory whose movie was removed is in the way, so replace it
+                shutil.rmtree(target, ignore_errors=True)
+                os.rename(temp_dir, target)
+            # otherwise another worker published this movie first, so keep theirs
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+    return movie
+
+
 @app.post("/")
 def get_map():
-    default_args = {
-        'location': "Западный округ",
-        'cars': 10,
-        'duration': 10,
-        'frames_per_second': 30,
-        'interactive': False,
-        'light_prescaling': 15,
-        'mp4': False,
-        'serialize': False
-    }
-    main(**default_args)
-    return jsonify({"is_files_to_dir": True})
-
-
-if __name__ == "__main__":
-    app.run(host='0.0.0.0', port=6000)
\ No newline at end of file
+    movie = render(default_args)
+    response = jsonify({"is_files_to_dir": True, "file": movie})
+    # the movie is cached on disk per set of arguments, but it is rendered again if movies/ is cleaned,
+    # so clients may keep the response while revalidating it on every request
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
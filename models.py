@@ -1,4 +1,5 @@
 import math
+import numba as nb
 import numpy as np
 import pandas as pd
 import random
@@ -171,6 +172,50 @@ def upcoming_linspace(frontview):
     return x, y
 
 
+@nb.njit(cache=True, fastmath=True)
+def in_linspace(x_obstacles, y_obstacles, x_space, y_space, tol_x, tol_y):
+    """
+    flags the obstacles which lie within tolerance of both the x and the y linspace
+
+    :param x_obstacles, y_obstacles: arrays: obstacle coordinates
+    :param         x_space, y_space: arrays: upcoming linspace of the car
+    :param             tol_x, tol_y: double: absolute tolerances
+    :return                    hits:  array: bool mask over the obstacles
+    """
+    hits = np.zeros(x_obstacles.shape[0], dtype=np.bool_)
+    for i in range(x_obstacles.shape[0]):
+        for k in range(x_space.shape[0]):
+            if abs(x_space[k] - x_obstacles[i]) <= tol_x:
+                for m in range(y_space.shape[0]):
+                    if abs(y_space[m] - y_obstacles[i]) <= tol_y:
+                        hits[i] = True
+                        break
+                break
+    return hits
+
+
+@nb.njit(cache=True, fastmath=True)
+def scan_obstacles(x_obstacles, y_obstacles, x_space, y_space, x, y, tol_x, tol_y):
+    """
+    finds the nearest obstacle lying on the upcoming linspace of a car at (x, y)
+
+    :param x_obstacles, y_obstacles: arrays: obstacle coordinates
+    :param         x_space, y_space: arrays: upcoming linspace of the car
+    :param                     x, y: double: position of the car
+    :param             tol_x, tol_y: double: absolute tolerances
+    :return         index, distance: int, double: index of the nearest obstacle and its distance (-1 and 0.0 if there is none)
+    """
+    hits = in_linspace(x_obstacles, y_obstacles, x_space, y_space, tol_x, tol_y)
+    # finite seed, since fastmath assumes no infinities; the first hit is taken through index == -1
+    index, distance = -1, 0.0
+    for i in range(hits.shape[0]):
+        if hits[i]:
+            d = math.hypot(x_obstacles[i] - x, y_obstacles[i] - y)
+            if index == -1 or d < distance:
+                index, distance = i, d
+    return index, distance
+
+
 def upcoming_vectors(view):
     """
     determines the vectors between the nodes in a view
@@ -4,14 +4,22 @@ and thus contains methods for updating car position and finding path to car dest
 also contains methods for locating cars and intersections in the front_view
 and calculating the curvature of the bend in the road for speed adjustments
 """
+from functools import lru_cache, partial
+from itertools import islice
+import igraph
+import math
 import models
 import networkx as nx
 import numpy as np
 import osmnx as ox
+import warnings
+
+# relative tolerance of the obstacle-in-linspace test, scaled by the car's coordinates once per scan
+obstacle_rtol = 1.0e-6
 
 
 class FrontView:
-    def __init__(self, car, graph, stop_distance=5, look_ahead_nodes=3):
+    def __init__(self, car, graph, stop_distance=5, look_ahead_nodes=3, view_cache=None):
         """
         take a car Series and determines the obstacles it faces in its frontal view
 
@@ -19,14 +27,18 @@ class FrontView:
         :param            graph: object: OGraph object from osm_request
         :param    stop_distance: int
         :param look_ahead_nodes: int
+        :param       view_cache: object: optional ViewCache shared across time-steps
         """
         self.stop_distance = stop_distance
         self.look_ahead_nodes = look_ahead_nodes
         self.car = car
         self.position = car['x'], car['y']
         self.graph = graph
-        self.view = self.determine_view()
-        self.angles = models.get_angles(self.view)
+        if view_cache is None:
+            self.view = self.determine_view()
+            self.angles = models.get_angles(self.view)
+        else:
+            self.view, self.angles = view_cache.lookup(self)
 
     def determine_view(self):
         """
@@ -45,7 +57,7 @@ class FrontView:
         """
         dispatches a car Series into another nav function and retrieves the distance to a car obstacle if there is one
 
-        :param      cars: Dataframe of cars
+        :param      cars: Dataframe of cars, or an Obstacles snapshot of it
         :return distance:
         """
         return car_obstacles(self, cars)
@@ -54,7 +66,7 @@ class FrontView:
         """
         dispatches a car Series into another nav function and retrieves the distance to a red light if there is one
 
-        :param    lights: Dataframe of lights
+        :param    lights: Dataframe of lights, or an Obstacles snapshot of it
         :return distance:
         """
         return light_obstacles(self, lights)
@@ -65,9 +77,8 @@ class FrontView:
 
         :return distance: double
         """
-        next_node = np.array(self.upcoming_node_position())
-        distance_vector = next_node - self.position
-        distance = models.magnitude(distance_vector)
+        next_x, next_y = self.upcoming_node_position()
+        distance = math.hypot(next_x - self.car['x'], next_y - self.car['y'])
         return distance
 
     def upcoming_node_position(self):
@@ -102,8 +113,8 @@ class FrontView:
         #  "Crossing a node" is used to update a car's velocity vector:
         #  i.e. once this function returns True, the car will begin piloting to the NEXT node in the route.
         tolerance = 1.0e-5
-        car_near_xnode = np.isclose(self.view[0][0], self.car['x'], rtol=tolerance)
-        car_near_ynode = np.isclose(self.view[0][1], self.car['y'], rtol=tolerance)
+        car_near_xnode = abs(self.view[0][0] - self.car['x']) <= tolerance * abs(self.car['x'])
+        car_near_ynode = abs(self.view[0][1] - self.car['y']) <= tolerance * abs(self.car['y'])
 
         if car_near_xnode and car_near_ynode:
             return True
@@ -128,6 +139,33 @@ class FrontView:
             return False
 
 
+class ViewCache:
+    def __init__(self):
+        """
+        per-car memo of FrontView.view and FrontView.angles across time-steps
+
+        a car's view only changes when it crosses a node and its path is shortened,
+        so an entry stays valid for as long as the length and head of the car's path are unchanged
+        """
+        self.entries = {}
+
+    def lookup(self, frontview):
+        """
+        returns the cached view and angles of the frontview's car, recomputing them if its path has moved on
+
+        :param frontview: object: FrontView object
+        :return view, angles:
+        """
+        xpath, ypath = frontview.car['xpath'], frontview.car['ypath']
+        key = (len(xpath), xpath[0], ypath[0]) if len(xpath) and len(ypath) else None
+        entry = self.entries.get(frontview.car.name)
+        if entry is None or entry[0] != key:
+            view = frontview.determine_view()
+            entry = (key, view, models.get_angles(view))
+            self.entries[frontview.car.name] = entry
+        return entry[1], entry[2]
+
+
 class StateView:
     def __init__(self, graph, car_index, cars, lights):
         """
@@ -418,38 +456,74 @@ class StateView:
         return dv_table
 
 
-# TODO: optimize this function
+class Obstacles:
+    def __init__(self, df):
+        """
+        a struct-of-arrays snapshot of a cars or lights dataframe for the per-time-step obstacle scans,
+        so the scans index contiguous arrays rather than Pandas rows
+
+        :param df: dataframe: cars or lights, with 'x', 'y', 'xbin' and 'ybin' columns
+        """
+        self.df = df
+        self.labels = df.index.to_numpy()
+        self.x = df['x'].to_numpy(dtype=np.float64)
+        self.y = df['y'].to_numpy(dtype=np.float64)
+        self.xbin = df['xbin'].to_numpy()
+        self.ybin = df['ybin'].to_numpy()
+
+    def __len__(self):
+        return len(self.labels)
+
+
+def obstacle_tolerances(frontview):
+    """
+    the absolute x and y tolerances for an obstacle to count as lying on the car's upcoming linspace
+
+    :param frontview: object: FrontView object
+    :return   tol_x, tol_y: double, double
+    """
+    return obstacle_rtol * abs(frontview.car['x']), obstacle_rtol * abs(frontview.car['y'])
+
+
+def nearby_obstacles(frontview, obstacles):
+    """
+    narrows cars or lights down to the candidates in the car's own bin, which are worth an exact linspace test
+
+    :param frontview: object: FrontView object
+    :param obstacles: object: Obstacles snapshot of cars or lights
+    :return   nearby:  array: positions into obstacles of the candidates in the car's bin
+    """
+    return np.flatnonzero((obstacles.xbin == frontview.car['xbin']) & (obstacles.ybin == frontview.car['ybin']))
+
+
 def car_obstacles(frontview, cars):
     """
-    Determines if there are any other_cars within the car's bin and then calculates the distance to the
-    nearest car in the same bin
+    Determines if there are any other_cars near the car's upcoming linspace and then calculates the distance
+    to the nearest one
 
     Parameters
     __________
     :param frontview:    object: FrontView object
-    :param      cars: dataframe:
+    :param      cars: dataframe or Obstacles:
 
     Returns
     _______
     :return distance: list: double or False (returns False if no car obstacle found)
     """
+    if not isinstance(cars, Obstacles):
+        cars = Obstacles(cars)
     x_space, y_space = models.upcoming_linspace(frontview)
     if x_space.any() and y_space.any():
-        other_cars = cars.drop(frontview.car.name)
-        obstacles = (frontview.car['xbin'] == other_cars['xbin']) & (frontview.car['ybin'] == other_cars['ybin'])
-        if obstacles.any():
-            nearby_cars = other_cars[obstacles]
-            for car in nearby_cars.iterrows():
-                car_within_xlinspace = np.isclose(x_space, car[1]['x'], rtol=1.0e-6).any()
-                car_within_ylinspace = np.isclose(y_space, car[1]['y'], rtol=1.0e-6).any()
-
-                if car_within_xlinspace and car_within_ylinspace:
-                    first_x, first_y = car[1]['x'], car[1]['y']
-                    vector = (first_x - frontview.car['x'], first_y - frontview.car['y'])
-                    distance = models.magnitude(vector)
-                    return distance
-                else:
-                    return False
+        nearby = nearby_obstacles(frontview, cars)
+        nearby = nearby[cars.labels[nearby] != frontview.car.name]
+        if nearby.size:
+            tol_x, tol_y = obstacle_tolerances(frontview)
+            hit, distance = models.scan_obstacles(cars.x[nearby], cars.y[nearby], x_space, y_space,
+                                                  frontview.car['x'], frontview.car['y'], tol_x, tol_y)
+            if hit >= 0:
+                return distance
+            else:
+                return False
         else:
             return False
     else:
@@ -463,35 +537,39 @@ def light_obstacles(frontview, lights):
     Parameters
     __________
     :param  frontview:    object: FrontView object
-    :param     lights: dataframe:
+    :param     lights: dataframe or Obstacles:
 
     Returns
     _______
     :return distance: list: double for False (returns False if no red light is found)
     """
+    if not isinstance(lights, Obstacles):
+        lights = Obstacles(lights)
     x_space, y_space = models.upcoming_linspace(frontview)
     if x_space.any() and y_space.any():
-        obstacles = (frontview.car['xbin'] == lights['xbin']) & (frontview.car['ybin'] == lights['ybin'])
-        if obstacles.any():
-            nearby_lights = lights[obstacles]
-            for light in nearby_lights.iterrows():
-                light_within_xlinspace = np.isclose(x_space[1:], light[1]['x'], rtol=1.0e-6).any()
-                light_within_ylinspace = np.isclose(y_space[1:], light[1]['y'], rtol=1.0e-6).any()
-
-                if light_within_xlinspace and light_within_ylinspace:
-                    car_vector = [light[1]['x'] - frontview.car['x'], light[1]['y'] - frontview.car['y']]
-                    face_values = light[1]['go-values']
-                    face_vectors = [(light[1]['out-xvectors'][i], light[1]['out-yvectors'][i])
-                                    for i in range(light[1]['degree'])]
-
-                    for value, vector in zip(face_values, face_vectors):
-                        if not value and models.determine_anti_parallel_vectors(car_vector, vector):
-                            distance = models.magnitude(car_vector)
-                            return distance
-                        else:
-                            continue
-                else:
-                    return False
+        nearby = nearby_obstacles(frontview, lights)
+        if nearby.size:
+            tol_x, tol_y = obstacle_tolerances(frontview)
+            hits = nearby[models.in_linspace(lights.x[nearby], lights.y[nearby],
+                                             x_space[1:], y_space[1:], tol_x, tol_y)]
+
+            # check the lights in view from nearest to farthest
+            distances = np.hypot(lights.x[hits] - frontview.car['x'], lights.y[hits] - frontview.car['y'])
+            # go-values change every step, so read the live columns rather than snapshotting them;
+            # positional .iat lookups avoid building a Series per light
+            go_values, face_vector_column = lights.df['go-values'], lights.df['face-vectors']
+            for i in hits[np.argsort(distances)]:
+                car_vector = [lights.x[i] - frontview.car['x'], lights.y[i] - frontview.car['y']]
+                face_values = go_values.iat[i]
+                face_vectors = face_vector_column.iat[i]
+
+                for value, vector in zip(face_values, face_vectors):
+                    if not value and models.determine_anti_parallel_vectors(car_vector, vector):
+                        distance = math.hypot(car_vector[0], car_vector[1])
+                        return distance
+                    else:
+                        continue
+            return False
         else:
             return False
     else:
@@ -508,19 +586,50 @@ def determine_pedigree(graph, node_id):
      """
     x, y = get_position_of_node(graph, node_id)
 
-    out_nodes = [dot for dot in graph.G[node_id].__iter__()]
+    # parallel out-edges to the same neighbour collapse into one out road; self-loops have no direction
+    out_nodes = [node for node in dict.fromkeys(v for _, v in graph.G.out_edges(node_id)) if node != node_id]
 
     vectors = []
     for node in out_nodes:
-        try:
-            out_x, out_y = lines_to_node(graph, node_id, node)[0][1]
-        except IndexError:
-            continue
+        # the out road is the (shortest) edge to the neighbour itself, so no path search is needed
+        out_x, out_y = route_lines(graph, (node_id, node))[0][1]
         vectors.append((out_x - x, out_y - y))
 
     return vectors
 
 
+def graph_table(graph, name, build):
+    """
+    returns a lookup table stored on the graph, building it on first use;
+    the tables live in graph.tables so they are freed along with the graph
+
+    :param graph: object: OGraph object from osm_request
+    :param  name:    str: key of the table in graph.tables
+    :param build: function: builds the table from the graph
+    :return table:
+    """
+    if name not in graph.tables:
+        graph.tables[name] = build(graph)
+    return graph.tables[name]
+
+
+def node_degrees(graph):
+    """
+    the node IDs of the map and their degrees as parallel arrays, computed once per OGraph
+
+    :param graph: object: OGraph object from osm_request
+    :return nodes, degrees: arrays: int64 node IDs and int32 degrees, in graph.G.nodes() order
+    """
+    return graph_table(graph, 'node-degrees', build_node_degrees)
+
+
+def build_node_degrees(graph):
+    """ builds the node_degrees table """
+    nodes = np.fromiter(graph.G.nodes(), dtype=np.int64, count=len(graph.G))
+    degrees = np.fromiter((degree for _, degree in graph.G.degree()), dtype=np.int32, count=len(nodes))
+    return nodes, degrees
+
+
 def find_culdesacs(graph):
     """
     culdesacs are nodes with only one edge connection and which are not on the boundary of the OpenStreetMap
@@ -529,7 +638,9 @@ def find_culdesacs(graph):
     :return culdesacs: list of node IDs
     """
     streets_per_node = ox.stats.count_streets_per_node(graph.G)
-    culdesacs = [key for key, value in streets_per_node.items() if int(value) == 1]
+    nodes = np.fromiter(streets_per_node.keys(), dtype=np.int64, count=len(streets_per_node))
+    streets = np.fromiter(streets_per_node.values(), dtype=np.int32, count=len(streets_per_node))
+    culdesacs = nodes[streets == 1].tolist()
     return culdesacs
 
 
@@ -539,13 +650,11 @@ def find_traffic_lights(graph, prescale=10):
 
     :param graph: object: OGraph object from osm_request
     :param prescale: int:
-    :return light_intersections: a list of node IDs suitable for traffic lights
+    :return light_intersections: a list of (node ID, degree) pairs suitable for traffic lights
     """
-    light_intersections = []
-    for i, node in enumerate(graph.G.degree()):
-        if (node[1] > 3) and not (i % prescale):
-            light_intersections.append(node)
-
+    nodes, degrees = node_degrees(graph)
+    mask = (degrees > 3) & (np.arange(len(nodes)) % prescale == 0)
+    light_intersections = list(zip(nodes[mask].tolist(), degrees[mask].tolist()))
     return light_intersections
 
 
@@ -557,10 +666,26 @@ def find_nodes(graph, n):
     :param      n: int
     :return nodes: list
     """
-    nodes = []
-    for node in graph.G.nodes():
-        nodes.append(node)
-    return nodes[:n]
+    return list(islice(graph.G.nodes(), n))
+
+
+def node_positions(graph):
+    """
+    a struct-of-arrays table of the map's node positions, built once per OGraph
+
+    :param graph: object: OGraph object from osm_request
+    :return node_index, node_xy: dict of node ID -> row, and a read-only (n, 2) float64 array of [x, y] rows
+    """
+    return graph_table(graph, 'node-positions', build_node_positions)
+
+
+def build_node_positions(graph):
+    """ builds the node_positions table """
+    node_ids = list(graph.G.nodes())
+    node_index = {node: i for i, node in enumerate(node_ids)}
+    node_xy = np.array([[graph.G.nodes[node]['x'], graph.G.nodes[node]['y']] for node in node_ids], dtype=np.float64)
+    node_xy.flags.writeable = False
+    return node_index, node_xy
 
 
 def get_position_of_node(graph, node):
@@ -569,13 +694,13 @@ def get_position_of_node(graph, node):
 
     :param graph: object: OGraph object from osm_request
     :param node:      graphml node ID
-    :return position: array:    [latitude, longitude]
+    :return position: array:    [latitude, longitude] (a read-only row of node_positions)
     """
     # note that the x and y coordinates of the graph.nodes are flipped
     # this is possibly an issue with the omnx graph.load_graphml method
     # a correction is to make the position tuple be (y, x) as below
-    position = np.array([graph.G.nodes[node]['x'], graph.G.nodes[node]['y']])
-    return position
+    node_index, node_xy = node_positions(graph)
+    return node_xy[node_index[node]]
 
 
 def get_init_path(graph, origin, destination):
@@ -606,7 +731,7 @@ def get_route(graph, origin, destination):
     :param destination: node ID
     :return:     route: list of intersection nodes
     """
-    return nx.shortest_path(graph.G, origin, destination, weight='length')
+    return list(shortest_route(graph, origin, destination))
 
 
 def eta(graph, car, lights, speed_limit=250):
@@ -770,32 +895,7 @@ def lines_to_node(graph, origin, destination):
     :param destination: int
     :return      lines: list
     """
-
-    route = nx.shortest_path(graph.G, origin, destination, weight='length')
-
-    # find the route lines
-    edge_nodes = list(zip(route[:-1], route[1:]))
-    lines = []
-    for u, v in edge_nodes:
-        # if there are parallel edges, select the shortest in length
-        data = min(graph.G.get_edge_data(u, v).values(), key=lambda x: x['length'])
-
-        # if it has a geometry attribute (ie, a list of line segments)
-        if 'geometry' in data:
-            # add them to the list of lines to plot
-            xs, ys = data['geometry'].xy
-            lines.append(list(zip(xs, ys)))
-        else:
-            # if it doesn't have a geometry attribute, the edge is a straight
-            # line from node to node
-            x1 = graph.G.nodes[u]['x']
-            y1 = graph.G.nodes[u]['y']
-            x2 = graph.G.nodes[v]['x']
-            y2 = graph.G.nodes[v]['y']
-            line = ((x1, y1), (x2, y2))
-            lines.append(line)
-
-    return lines
+    return route_lines(graph, shortest_route(graph, origin, destination))
 
 
 def shortest_path_lines_nx(graph, origin, destination):
@@ -813,9 +913,86 @@ def shortest_path_lines_nx(graph, origin, destination):
     :return lines: list:
         [(double, double), ...]:   each tuple represents the bend-point in a straight road
     """
+    return route_lines(graph, shortest_route(graph, origin, destination))
+
+
+def igraph_of(graph):
+    """
+    converts the map into an igraph Graph, once per OGraph, so shortest paths run in igraph's C implementation
+
+    :param graph: object: OGraph object from osm_request
+    :return ig_graph, vertex_ids: igraph.Graph with 'osmid' vertex and 'length' edge attributes,
+                                  and a dict of node ID -> igraph vertex ID
+    """
+    return graph_table(graph, 'igraph', build_igraph)
+
+
+def build_igraph(graph):
+    """ builds the igraph_of table """
+    nodes = list(graph.G.nodes())
+    vertex_ids = {node: i for i, node in enumerate(nodes)}
+    edges, lengths = [], []
+    for u, v, length in graph.G.edges(data='length'):
+        edges.append((vertex_ids[u], vertex_ids[v]))
+        lengths.append(length)
+
+    ig_graph = igraph.Graph(n=len(nodes), edges=edges, directed=True)
+    ig_graph.vs['osmid'] = nodes
+    ig_graph.es['length'] = lengths
+    return ig_graph, vertex_ids
+
+
+def shortest_route(graph, origin, destination):
+    """
+    memoized Dijkstra shortest path (weight=length); the map is static, so a route depends only on its endpoints
+
+    :param graph: object: OGraph object from osm_request
+    :param      origin: int:    node ID
+    :param destination: int:    node ID
+    :return      route: tuple: node IDs from origin to destination
+    """
+    return graph_table(graph, 'routes', build_route_cache)(origin, destination)
 
-    route = nx.shortest_path(graph.G, origin, destination, weight='length')
 
+def build_route_cache(graph):
+    """
+    builds the per-graph memo of shortest_route; it binds only the igraph tables, not the OGraph itself
+    """
+    return lru_cache(maxsize=100_000)(partial(igraph_route, *igraph_of(graph)))
+
+
+def igraph_route(ig_graph, vertex_ids, origin, destination):
+    """
+    Dijkstra shortest path (weight=length) on the igraph copy of the map
+
+    :param   ig_graph: igraph.Graph: see igraph_of
+    :param vertex_ids:         dict: node ID -> igraph vertex ID
+    :param     origin:          int: node ID
+    :param destination:         int: node ID
+    :return     route:        tuple: node IDs from origin to destination
+    """
+    source, target = vertex_ids.get(origin), vertex_ids.get(destination)
+    if source is None:
+        raise nx.NodeNotFound('Source {} is not in G'.format(origin))
+    if target is None:
+        raise nx.NodeNotFound('Target {} is not in G'.format(destination))
+    with warnings.catch_warnings():
+        # igraph warns when the destination is unreachable; that case is raised as NetworkXNoPath below
+        warnings.simplefilter('ignore', RuntimeWarning)
+        vpath = ig_graph.get_shortest_paths(source, target, weights='length', output='vpath')[0]
+    if not vpath:
+        raise nx.NetworkXNoPath('No path between {} and {}.'.format(origin, destination))
+    return tuple(ig_graph.vs[vpath]['osmid'])
+
+
+def route_lines(graph, route):
+    """
+    extracts the line geometry of each edge along a route
+
+    :param graph: object: OGraph object from osm_request
+    :param route:  tuple: node IDs
+    :return lines:  list: one list of (x, y) bend-points per edge
+    """
     # find the route lines
     edge_nodes = list(zip(route[:-1], route[1:]))
     lines = []
@@ -831,10 +1008,8 @@ def shortest_path_lines_nx(graph, origin, destination):
         else:
             # if it doesn't have a geometry attribute, the edge is a straight
             # line from node to node
-            x1 = graph.G.nodes[u]['x']
-            y1 = graph.G.nodes[u]['y']
-            x2 = graph.G.nodes[v]['x']
-            y2 = graph.G.nodes[v]['y']
+            x1, y1 = get_position_of_node(graph, u)
+            x2, y2 = get_position_of_node(graph, v)
             line = ((x1, y1), (x2, y2))
             lines.append(line)
 
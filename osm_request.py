@@ -1,5 +1,6 @@
 import osmnx as ox
 import os
+import pickle
 
 
 class OGraph:
@@ -17,8 +18,11 @@ class OGraph:
         self.preview = preview
         self.store = 'graphml_files'
         self.graph_name = self.query.lower().replace(',', '').replace(' ', '_') + '.graphml'
+        self.projected_name = self.graph_name.replace('.graphml', '.projected.pkl')
         self.local_files = os.listdir(self.store)
-        self.init_graph = self.request()
+        self.init_graph = None
+        # lookup tables over G (node positions, igraph copy, routes, ...) built lazily by navigation
+        self.tables = {}
         self.fig, self.axis = None, None
         self.ax, self.G = self.project_axis()
 
@@ -50,13 +54,52 @@ class OGraph:
                               f' Please try a geocode-able place from OpenStreetMaps.')
         return G
 
+    def load_projected(self):
+        """
+        Loads the projected graph from its pickle in the store if there is one, else requests and projects the graph,
+        pickling the result when saving. This skips the XML parse and reprojection on later runs.
+        The pickle is ignored when its .graphml is newer, or when it cannot be unpickled (e.g. after an upgrade).
+
+        :return: graph: projected OSMN Graph object
+        """
+        path = self.store + '/' + self.projected_name
+        if self.projected_is_fresh():
+            try:
+                with open(path, 'rb') as f:
+                    return pickle.load(f)
+            except Exception:
+                print(f'Could not load {path}, reloading the graph.')
+
+        self.init_graph = self.request()
+        graph = ox.project_graph(self.init_graph)
+        if self.save:
+            # write to a temporary file and rename it, so a reader never sees a partially written pickle
+            temp_path = f'{path}.{os.getpid()}.tmp'
+            with open(temp_path, 'wb') as f:
+                pickle.dump(graph, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_path, path)
+        return graph
+
+    def projected_is_fresh(self):
+        """
+        Determines if there is a projected pickle in the store which is at least as new as its .graphml source
+
+        :return: bool:
+        """
+        if self.projected_name not in self.local_files:
+            return False
+        if self.graph_name not in self.local_files:
+            return True
+        projected_mtime = os.path.getmtime(self.store + '/' + self.projected_name)
+        return projected_mtime >= os.path.getmtime(self.store + '/' + self.graph_name)
+
     def project_axis(self):
         """
         projects graph geometry and plots figure, retrieving an axis
         :return: self.fig, self.axis, ax, graph
         """
         # project and plot
-        graph = ox.project_graph(self.init_graph)
+        graph = self.load_projected()
         fig, ax = ox.plot_graph(graph, node_size=0, figsize=(8, 8), edge_linewidth=0.5,
                                 show=True if self.preview else False,
                                 bgcolor='#FFFFFF')
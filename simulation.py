@@ -17,7 +17,7 @@ default_acceleration = 4
 
 
 # TODO: profile
-def update_cars(cars, graph, dt):
+def update_cars(cars, graph, dt, view_cache=None):
     """
     This function shortens the stored path of a car after determining if the car crossed the next node in the path
     Then calculates the direction and magnitude of the velocity
@@ -25,6 +25,7 @@ def update_cars(cars, graph, dt):
     :param:       cars: dataframe
     :param:      graph: OGraph object from osm_request
     :param:         dt: double
+    :param: view_cache: ViewCache: optional, reuses each car's view and angles until it crosses a node
     :return:     list: four Series's suitable for the main dataframe
     """
     new_route = []
@@ -41,7 +42,7 @@ def update_cars(cars, graph, dt):
             new_times.append(car[1]['route-time'] + dt)
 
             # initialize an obstacle scan of the frontal view
-            frontview = nav.FrontView(car[1], graph, stop_distance=stop_distance)
+            frontview = nav.FrontView(car[1], graph, stop_distance=stop_distance, view_cache=view_cache)
 
             # determine if the car has just crossed a node
             if frontview.crossed_node_event():
@@ -55,7 +56,7 @@ def update_cars(cars, graph, dt):
             position = np.array(frontview.position)
 
             velocity_direction = models.unit_vector(next_node - position)
-            velocity = velocity_direction * speed_limit * update_speed_factor(car[1])
+            velocity = velocity_direction * speed_limit * update_speed_factor(car[1], frontview.angles)
 
             # if the car has stalled and accelerate() returns True, then give it a push
             if np.isclose(0, velocity, atol=0.1).all() and accelerate(car[1]):
@@ -96,15 +97,16 @@ def accelerate(car):
         return False
 
 
-def update_speed_factor(car):
+def update_speed_factor(car, angles=None):
     """
     handles logic for updating speed according to road curvature and car obstacles
 
     :param            car: Series
+    :param         angles: double: optional, the car's upcoming road curvature if already known
     :return: final_factor: double
     """
-    frontview = nav.FrontView(car, stop_distance)
-    angles = frontview.angles
+    if angles is None:
+        angles = nav.FrontView(car, stop_distance).angles
     distance_to_node = car['distance-to-node']
     distance_to_car = car['distance-to-car']
     distance_to_red_light = car['distance-to-red-light']
@@ -368,6 +370,7 @@ def init_traffic_lights(graph, prescale=10):
         light['out-ypositions'] = [position[1] + epsilon * out_vectors[j][1] for j in range(light['degree'])]
         light['out-xvectors'] = [out_vectors[j][0] for j in range(light['degree'])]
         light['out-yvectors'] = [out_vectors[j][1] for j in range(light['degree'])]
+        light['face-vectors'] = list(zip(light['out-xvectors'], light['out-yvectors']))
         light['go-values'] = np.array([go[j] for j in range(light['degree'])])
 
         lights_data.append(light)